@@ -1,145 +1,324 @@
 import cv2
 import matplotlib.pyplot as plt
 import numpy as np
-import json
+import orjson
 import os
+import sys
+import time
+from pathlib import Path
 
 class PointSelector:
-    def __init__(self, center_img, other_img, other_name, num_points=6, out_dir="results"):
+    def __init__(self, center_img, other_img, other_name, num_points=6,
+                 out_dir="results", coord_scale=1.0):
         self.num_points = num_points
+        # Factor mapping picking coordinates back to the original image
+        # frame (e.g. 2.0 when images were decoded with IMREAD_REDUCED_COLOR_2)
+        self.coord_scale = coord_scale
         self.other_name = os.path.splitext(os.path.basename(other_name))[0]
-        self.out_dir = out_dir
-        os.makedirs(out_dir, exist_ok=True)
 
-        # Convert to RGB for display
-        self.center_img = cv2.cvtColor(center_img, cv2.COLOR_BGR2RGB)
-        self.other_img = cv2.cvtColor(other_img, cv2.COLOR_BGR2RGB)
+        # Output paths computed once (caller is responsible for creating
+        # out_dir, see main)
+        self._json_path = Path(out_dir) / f"pairs_{self.other_name}.json"
+        self._img_path = f"{out_dir}/pairs_{self.other_name}.png"
+        self._session_path = f"{out_dir}/session_{self.other_name}.npz"
 
-        # Combine the two images side by side
-        self.h1, self.w1, _ = self.center_img.shape
-        self.h2, self.w2, _ = self.other_img.shape
+        # Combine the two images side by side, converting BGR->RGB directly
+        # into the combined buffer (no intermediate full-image copies)
+        self.h1, self.w1, _ = center_img.shape
+        self.h2, self.w2, _ = other_img.shape
         self.h = max(self.h1, self.h2)
-        self.combined = np.zeros((self.h, self.w1 + self.w2, 3), dtype=np.uint8)
-        self.combined[:self.h1, :self.w1] = self.center_img
-        self.combined[:self.h2, self.w1:self.w1+self.w2] = self.other_img
-
-        # Store points
-        self.pts_center = []
-        self.pts_other = []
+        self.combined = np.empty((self.h, self.w1 + self.w2, 3), dtype=np.uint8)
+        cv2.cvtColor(center_img, cv2.COLOR_BGR2RGB,
+                     dst=self.combined[:self.h1, :self.w1])
+        cv2.cvtColor(other_img, cv2.COLOR_BGR2RGB,
+                     dst=self.combined[:self.h2, self.w1:self.w1+self.w2])
+        # Zero only the padding strips below the shorter image (no-ops when
+        # the heights match, instead of zero-filling the whole canvas)
+        self.combined[self.h1:, :self.w1] = 0
+        self.combined[self.h2:, self.w1:] = 0
+
+        # Keep views (not copies) in case callers want the RGB halves
+        self.center_img = self.combined[:self.h1, :self.w1]
+        self.other_img = self.combined[:self.h2, self.w1:self.w1+self.w2]
+
+        # Store points in preallocated float32 arrays; self._n counts
+        # completed pairs (a pending left click sits at index self._n)
+        self.pts_center = np.empty((num_points, 2), dtype=np.float32)
+        self.pts_other = np.empty_like(self.pts_center)
+        self._n = 0
 
         # State: 0 = waiting for left click, 1 = waiting for right click
         self.click_state = 0
 
+        # Drop click bursts faster than ~50 Hz (trackpads can synthesize
+        # extra press events, flooding the handler with redraws)
+        self._last_click_t = 0.0
+        self._min_dt = 0.02
+
         # Setup figure
         self.fig, self.ax = plt.subplots(figsize=(12, 6))
-        self.ax.imshow(self.combined)
-        self.ax.set_title("Click LEFT image point, then RIGHT image point")
+
+        # Display-only proxy at ~2x the figure pixel size: for 4K/8K photos
+        # every later resize reads this small array instead of the full
+        # combined image. Picked coordinates stay full-resolution because
+        # the imshow extent below maps back to the original frame.
+        target_px = 2 * int(max(self.fig.get_size_inches()) * self.fig.dpi)
+        scale = min(1.0, target_px / max(self.h, self.w1 + self.w2))
+        if scale < 1.0:
+            self._disp = cv2.resize(self.combined, None, fx=scale, fy=scale,
+                                    interpolation=cv2.INTER_AREA)
+        else:
+            self._disp = self.combined
+
+        # Pre-render the (static) combined image at the figure's pixel size so
+        # matplotlib never has to resample the full-resolution array per draw.
+        # The extent keeps event.xdata/ydata in original image coordinates.
+        w_px = int(self.fig.get_size_inches()[0] * self.fig.dpi)
+        h_px = int(self.fig.get_size_inches()[1] * self.fig.dpi)
+        self._bg_rgba = cv2.resize(self._disp, (w_px, h_px),
+                                   interpolation=cv2.INTER_AREA)
+        self._im = self.ax.imshow(self._bg_rgba, interpolation='none',
+                                  resample=False, aspect='auto',
+                                  extent=(0, self.w1 + self.w2, self.h, 0))
+        self.ax.set_title("Click LEFT image point, then RIGHT image point "
+                          "(Ctrl+Z = undo, R = reset)")
         self.ax.axis("off")
 
+        # Persistent animated artists for blitting, one tuple per pair:
+        # (line, dots, label-left, label-right)
+        self._artists = []
+        self._bg = None  # cached background, captured after the first draw
+
+        # On-canvas status line + buffered log (stdout writes stall the
+        # event loop on some backends, so messages are flushed at the end)
+        self._status = self.ax.text(0.01, 0.99, "", transform=self.ax.transAxes,
+                                    color="yellow", fontsize=10, va="top",
+                                    animated=True)
+        self._log = []
+        self._status_extent = None  # screen region covered by the last status text
+
         # Connect mouse + keyboard
         self.cid = self.fig.canvas.mpl_connect('button_press_event', self.onclick)
         self.kid = self.fig.canvas.mpl_connect('key_press_event', self.onkey)
+        self.rid = self.fig.canvas.mpl_connect('resize_event', self.on_resize)
+        self.did = self.fig.canvas.mpl_connect('draw_event', self.on_draw)
 
     def onclick(self, event):
-        if event.inaxes != self.ax:
+        if event.inaxes != self.ax or self._n >= self.num_points:
             return
 
+        now = time.perf_counter()
+        if now - self._last_click_t < self._min_dt:
+            return
+        self._last_click_t = now
+
         x, y = event.xdata, event.ydata
 
         if self.click_state == 0 and x < self.w1:
             # Click on left (center) image
-            self.pts_center.append((x, y))
-            print(f"Picked LEFT point {len(self.pts_center)}: ({x:.1f}, {y:.1f})")
+            self.pts_center[self._n] = (x, y)
+            self._notify(f"Picked LEFT point {self._n + 1}: ({x:.1f}, {y:.1f})")
             self.click_state = 1
-            self.redraw()
+            self._blit_new()
 
         elif self.click_state == 1 and x >= self.w1:
             # Click on right (other) image
-            self.pts_other.append((x - self.w1, y))  # shift into right coords
-            print(f"Picked RIGHT point {len(self.pts_other)}: ({x - self.w1:.1f}, {y:.1f})")
+            self.pts_other[self._n] = (x - self.w1, y)  # shift into right coords
+            self._n += 1
+            self._notify(f"Picked RIGHT point {self._n}: ({x - self.w1:.1f}, {y:.1f})")
             self.click_state = 0
-            self.redraw()
+            pair = self._add_pair_artists(self.pts_center[self._n - 1],
+                                          self.pts_other[self._n - 1], self._n)
+            self._blit_new(pair)
 
             # Stop if enough pairs
-            if len(self.pts_center) >= self.num_points and len(self.pts_other) >= self.num_points:
-                print("\n✅ All points selected!\n")
+            if self._n >= self.num_points:
+                self._log.append("\n✅ All points selected!\n")
                 plt.close(self.fig)
                 self.save_results()
 
     def onkey(self, event):
         # Undo with Ctrl+Z
         if event.key == 'ctrl+z':
-            if self.click_state == 1 and len(self.pts_center) > 0:
-                removed = self.pts_center.pop()
-                print(f"↩️ Undo: removed LEFT point {removed}")
+            if self.click_state == 1:
+                removed = self.pts_center[self._n]
+                self._notify(f"↩️ Undo: removed LEFT point "
+                             f"({removed[0]:.1f}, {removed[1]:.1f})")
                 self.click_state = 0
-            elif self.click_state == 0 and len(self.pts_other) > 0:
-                removedR = self.pts_other.pop()
-                removedL = self.pts_center.pop()
-                print(f"↩️ Undo: removed pair LEFT {removedL}, RIGHT {removedR}")
+                self._blit_new()
+            elif self.click_state == 0 and self._n > 0:
+                self._n -= 1
+                removedL = self.pts_center[self._n]
+                removedR = self.pts_other[self._n]
+                self._notify(f"↩️ Undo: removed pair "
+                             f"LEFT ({removedL[0]:.1f}, {removedL[1]:.1f}), "
+                             f"RIGHT ({removedR[0]:.1f}, {removedR[1]:.1f})")
+                self._pop_pair_artists()
+                self.redraw()
             else:
-                print("Nothing to undo")
-            self.redraw()
+                self._notify("Nothing to undo")
+                self._blit_new()
 
         # Reset all points with "r"
         elif event.key == 'r':
-            self.pts_center.clear()
-            self.pts_other.clear()
+            self._n = 0
             self.click_state = 0
-            print("🔄 Reset: cleared all selected points for this image pair")
+            while self._artists:
+                self._pop_pair_artists()
+            self._notify("🔄 Reset: cleared all selected points for this image pair")
             self.redraw()
 
-    def redraw(self):
-        """Redraw all selected points and lines"""
-        self.ax.clear()
-        self.ax.imshow(self.combined)
-        self.ax.axis("off")
+    def ingest_batch(self, events):
+        """Load pre-recorded clicks (combined-image coords) in one shot.
+
+        Partitions an (N, 2) array into left/right-image points with a
+        boolean mask on x and pairs them in order — no per-event Python
+        state machine and no matplotlib event plumbing, so a JSON click
+        log can be replayed for offline/regression use.
+        """
+        events = np.asarray(events, dtype=np.float32)
+        left_mask = events[:, 0] < self.w1
+        left = events[left_mask]
+        right = events[~left_mask]  # boolean indexing copies, safe to shift
+        right[:, 0] -= self.w1
+
+        n = min(len(left), len(right), self.num_points)
+        self.pts_center[:n] = left[:n]
+        self.pts_other[:n] = right[:n]
+        self._n = n
+        self.click_state = 0
 
-        for i, (ptL, ptR) in enumerate(zip(self.pts_center, self.pts_other), start=1):
-            xL, yL = ptL
-            xR, yR = ptR[0] + self.w1, ptR[1]
-            self.ax.plot([xL, xR], [yL, yR], 'r-')
-            self.ax.plot(xL, yL, 'bo')
-            self.ax.plot(xR, yR, 'bo')
-            self.ax.text(xL, yL-5, f"{i}", color="yellow", fontsize=10, ha="center")
-            self.ax.text(xR, yR-5, f"{i}", color="yellow", fontsize=10, ha="center")
+    def _notify(self, msg):
+        """Show a message on the status artist and buffer it for stdout"""
+        # matplotlib's default font has no emoji glyphs, so keep those
+        # only in the terminal log
+        self._status.set_text(msg.encode("ascii", "ignore").decode().lstrip())
+        self._log.append(msg)
+
+    def on_draw(self, event):
+        """Re-capture the blitting background after any full draw"""
+        canvas = self.fig.canvas
+        self._bg = canvas.copy_from_bbox(self.ax.bbox)
+        # A full draw skips animated artists, so re-stamp them or every
+        # picked marker vanishes until the next undo/reset (no blit needed
+        # from inside a draw callback)
+        for pair in self._artists:
+            for artist in pair:
+                self.ax.draw_artist(artist)
+        self.ax.draw_artist(self._status)
+        self._status_extent = self._status.get_window_extent(
+            canvas.get_renderer())
+
+    def on_resize(self, event):
+        """Re-render the background buffer, then schedule one full redraw"""
+        w_px = max(1, int(self.ax.bbox.width))
+        h_px = max(1, int(self.ax.bbox.height))
+        self._bg_rgba = cv2.resize(self._disp, (w_px, h_px),
+                                   interpolation=cv2.INTER_AREA)
+        self._im.set_data(self._bg_rgba)
+        # draw_idle coalesces resize bursts into a single full draw;
+        # on_draw re-captures the background when it actually happens
+        self._bg = None
+        self.fig.canvas.draw_idle()
+
+    def _add_pair_artists(self, ptL, ptR, i):
+        """Create the line/dots/label artists for pair i (1-based)"""
+        xL, yL = ptL
+        xR, yR = ptR[0] + self.w1, ptR[1]
+        line, = self.ax.plot([xL, xR], [yL, yR], 'r-', animated=True)
+        dots, = self.ax.plot([xL, xR], [yL, yR], 'bo', animated=True)
+        txtL = self.ax.text(xL, yL-5, f"{i}", color="yellow", fontsize=10,
+                            ha="center", animated=True)
+        txtR = self.ax.text(xR, yR-5, f"{i}", color="yellow", fontsize=10,
+                            ha="center", animated=True)
+        pair = (line, dots, txtL, txtR)
+        self._artists.append(pair)
+        return pair
+
+    def _pop_pair_artists(self):
+        """Remove the artists of the most recent pair"""
+        if self._artists:
+            for artist in self._artists.pop():
+                artist.remove()
+
+    def _blit_new(self, new_artists=()):
+        """O(1) update: repaint the status strip, stamp only the new artists"""
+        canvas = self.fig.canvas
+        if self._bg is None:
+            self.redraw()
+            return
+        if self._status_extent is not None:
+            # Erase the previous status text without touching the rest
+            canvas.restore_region(self._bg, bbox=self._status_extent)
+        for artist in new_artists:
+            self.ax.draw_artist(artist)
+        self.ax.draw_artist(self._status)
+        self._status_extent = self._status.get_window_extent(
+            canvas.get_renderer())
+        canvas.blit(self.ax.bbox)
 
-        self.ax.set_title(f"Selected {len(self.pts_center)} / {self.num_points} pairs "
-                          "(Ctrl+Z = undo, R = reset)")
-        self.fig.canvas.draw()
+    def redraw(self):
+        """Full rebuild: blit every pair over the cached background"""
+        canvas = self.fig.canvas
+        if self._bg is None:
+            # No cached background yet: do one full draw (on_draw captures it)
+            canvas.draw()
+
+        canvas.restore_region(self._bg)
+        for pair in self._artists:
+            for artist in pair:
+                self.ax.draw_artist(artist)
+        self.ax.draw_artist(self._status)
+        self._status_extent = self._status.get_window_extent(
+            canvas.get_renderer())
+        canvas.blit(self.ax.bbox)
 
     def save_results(self):
         """Save JSON + annotated image, print correspondence table"""
+        # Flush the buffered click log in one write
+        if self._log:
+            sys.stdout.write("\n".join(self._log) + "\n")
+            self._log.clear()
+
         # Save JSON
+        # Scale picked coordinates back to the original image frame
+        pts_center = self.pts_center[:self._n] * self.coord_scale
+        pts_other = self.pts_other[:self._n] * self.coord_scale
+
         data = {
             "image_pair": self.other_name,
-            "points_center": [list(map(float, pt)) for pt in self.pts_center],
-            "points_other": [list(map(float, pt)) for pt in self.pts_other]
+            "points_center": pts_center,
+            "points_other": pts_other
         }
-        json_path = os.path.join(self.out_dir, f"pairs_{self.other_name}.json")
-        with open(json_path, "w") as f:
-            json.dump(data, f, indent=4)
-        print(f"💾 Saved point pairs to {json_path}")
-
-        # Save annotated image
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.imshow(self.combined)
-        ax.axis("off")
-        ax.set_title(f"Point pairs for {self.other_name}")
-
-        for i, (ptL, ptR) in enumerate(zip(self.pts_center, self.pts_other), start=1):
-            xL, yL = ptL
-            xR, yR = ptR[0] + self.w1, ptR[1]
-            ax.plot([xL, xR], [yL, yR], 'r-')
-            ax.plot(xL, yL, 'bo')
-            ax.plot(xR, yR, 'bo')
-            ax.text(xL, yL-5, f"{i}", color="yellow", fontsize=10, ha="center")
-            ax.text(xR, yR-5, f"{i}", color="yellow", fontsize=10, ha="center")
-
-        img_path = os.path.join(self.out_dir, f"pairs_{self.other_name}.png")
-        fig.savefig(img_path, bbox_inches="tight")
-        plt.close(fig)
-        print(f"💾 Saved annotated image to {img_path}")
+        self._json_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 |
+                                                 orjson.OPT_SERIALIZE_NUMPY))
+        print(f"💾 Saved point pairs to {self._json_path}")
+
+        # Compressed binary session log: reloads as contiguous float32
+        # arrays via np.load, no JSON parsing needed for long sessions
+        np.savez_compressed(self._session_path, pts_center=pts_center,
+                            pts_other=pts_other,
+                            image_pair=np.array(self.other_name))
+        print(f"💾 Saved session log to {self._session_path}")
+
+        # Save annotated image: draw directly on a pixel copy with OpenCV
+        # instead of re-rendering a matplotlib figure through Agg
+        annot = self.combined.copy()
+        for i, (ptL, ptR) in enumerate(zip(self.pts_center[:self._n],
+                                           self.pts_other[:self._n]), start=1):
+            xL, yL = int(ptL[0]), int(ptL[1])
+            xR, yR = int(ptR[0]) + self.w1, int(ptR[1])
+            cv2.line(annot, (xL, yL), (xR, yR), (255, 0, 0), 2)
+            cv2.circle(annot, (xL, yL), 4, (0, 0, 255), -1)
+            cv2.circle(annot, (xR, yR), 4, (0, 0, 255), -1)
+            cv2.putText(annot, f"{i}", (xL, yL-5), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.5, (255, 255, 0), 1)
+            cv2.putText(annot, f"{i}", (xR, yR-5), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.5, (255, 255, 0), 1)
+
+        cv2.cvtColor(annot, cv2.COLOR_RGB2BGR, dst=annot)
+        cv2.imwrite(self._img_path, annot)
+        print(f"💾 Saved annotated image to {self._img_path}")
 
         # Print correspondence table
         print("=============================================")
@@ -147,19 +326,20 @@ class PointSelector:
         print("=============================================")
         print(f"{'Pair':<5} {'Center Image (x,y)':<25} {'Other Image (x,y)':<25}")
         print("---------------------------------------------")
-        for i, (ptL, ptR) in enumerate(zip(self.pts_center, self.pts_other), start=1):
+        for i, (ptL, ptR) in enumerate(zip(pts_center, pts_other), start=1):
             print(f"{i:<5} ({ptL[0]:6.1f}, {ptL[1]:6.1f})    "
                   f"({ptR[0]:6.1f}, {ptR[1]:6.1f})")
         print("=============================================\n")
 
     def get_points(self):
         plt.show()
-        return (np.array(self.pts_center, dtype=np.float32),
-                np.array(self.pts_other, dtype=np.float32))
+        return (self.pts_center[:self._n] * self.coord_scale,
+                self.pts_other[:self._n] * self.coord_scale)
 
 
-def pick_points(center_img, other_img, other_name, num_points=6):
-    selector = PointSelector(center_img, other_img, other_name, num_points=num_points)
+def pick_points(center_img, other_img, other_name, num_points=6, coord_scale=1.0):
+    selector = PointSelector(center_img, other_img, other_name,
+                             num_points=num_points, coord_scale=coord_scale)
     return selector.get_points()
 
 
@@ -167,19 +347,29 @@ def main():
     center_path = "photos/center.jpg"
     other_paths = ["photos/img4.jpg", "photos/img5.jpg"]
 
-    center_img = cv2.imread(center_path)
+    # Create the output directory once for the whole batch
+    os.makedirs("results", exist_ok=True)
+
+    # Decode at half resolution for picking (libjpeg scales in the DCT
+    # domain, far cheaper than full decode + resize); coord_scale maps the
+    # picked points back to the original image frame
+    reduce_factor = 2
+
+    center_img = cv2.imread(center_path, cv2.IMREAD_REDUCED_COLOR_2)
     if center_img is None:
         print("Error: could not load center image.")
         return
 
     for idx, path in enumerate(other_paths):
-        other_img = cv2.imread(path)
+        other_img = cv2.imread(path, cv2.IMREAD_REDUCED_COLOR_2)
         if other_img is None:
             print(f"Error: could not load {path}")
             continue
 
         print(f"\n==== Picking points for {path} ====")
-        pts_center, pts_other = pick_points(center_img, other_img, path, num_points=6)
+        pts_center, pts_other = pick_points(center_img, other_img, path,
+                                            num_points=6,
+                                            coord_scale=reduce_factor)
 
 
 if __name__ == "__main__":
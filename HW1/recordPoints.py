@@ -1,4 +1,5 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import cv2
 
 # Load image
@@ -15,19 +16,22 @@ def onclick(event):
         points.append((x, y))
         print(f"Point selected: {(x, y)}")
 
-        # Draw a red dot
-        plt.plot(x, y, 'ro')
-        plt.draw()
+        # Update the single scatter artist instead of adding a new
+        # Line2D + full draw per click
+        scat.set_offsets(np.asarray(points, dtype=np.float32))
+        fig.canvas.draw_idle()
 
 # Show image
 fig, ax = plt.subplots()
 ax.imshow(img_rgb)
 ax.set_title("Click points (close window when done)")
 
+# One persistent PathCollection holds all clicked points
+scat = ax.scatter([], [], c='red', s=20)
+
 # Connect callback
 cid = fig.canvas.mpl_connect('button_press_event', onclick)
 
 plt.show()
 
 print("Final points:", points)
-